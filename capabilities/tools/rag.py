@@ -1,23 +1,36 @@
 import os
-from typing import List, Optional
-from modules import Retrieve, Chunk, Document, CachedInMemoryVectorStore
+from typing import Optional
+from modules import Retrieve, Document, SearchPage, CachedInMemoryVectorStore
+
+# Shared across calls so a paginated query is embedded once and every page
+# ranks against the same vector. Bounded so it can't grow with traffic.
+_query_cache_manager = CachedInMemoryVectorStore(
+    write_to_json=False,
+    max_entries=256,
+)
 
 def retrieve_augmented_generation(
     *,
     query: str,
     k: int = 2,
+    cursor: Optional[str] = None,
+    snippet_chars: Optional[int] = None,
     metadata: Optional[dict[str, str]] = None,
-) -> List[Chunk]:
+) -> SearchPage:
     """
     Perform retrieval-augmented generation (RAG) of me from vectorstore.
 
     Args:
         query (str): The input query for RAG.
-        k (int, optional): Number of documents to retrieve. Defaults to 2.
+        k (int, optional): Number of documents to retrieve per page. Defaults to 2.
+        cursor (str, optional): `next_cursor` from the previous call to fetch the next page. Defaults to None.
+            Cursors are only valid within the same server process: after a restart, or on another
+            worker, the query is embedded again and the next page may skip or repeat results.
+        snippet_chars (int, optional): Truncate each chunk to at most this many characters, "..." markers included, around the matching text. Defaults to None.
         metadata(dict[str, str], optional): Metadata for the query. Defaults to None.
 
     Returns:
-        List[Chunk]: List of retrieved document chunks.
+        SearchPage: Retrieved document chunks and the cursor for the next page.
 
     Note:
         metadata is a dictionary that can contain any additional information.
@@ -39,15 +52,15 @@ def retrieve_augmented_generation(
     else:
         retriever = Retrieve(
             user_name="user",
-            cache_manager=CachedInMemoryVectorStore(
-                write_to_json=False,
-            ),
+            cache_manager=_query_cache_manager,
         )
         
-    retrieved_docs = retriever.similarity_search(
+    retrieved_docs = retriever.paginated_similarity_search(
         query=query, 
         k=k,
+        cursor=cursor,
         filter=None,
+        snippet_chars=snippet_chars,
         **(metadata or {}),
     )
     return retrieved_docs
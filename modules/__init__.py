@@ -1,4 +1,4 @@
-from .rag.retrieve import Retrieve, Chunk, Document
+from .rag.retrieve import Retrieve, Chunk, Document, SearchPage
 from .rag.vectorcache import CachedInMemoryVectorStore
 
-__all__ = ["Retrieve", "Chunk", "Document", "CachedInMemoryVectorStore"]
\ No newline at end of file
+__all__ = ["Retrieve", "Chunk", "Document", "SearchPage", "CachedInMemoryVectorStore"]
\ No newline at end of file
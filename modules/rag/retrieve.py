@@ -1,12 +1,16 @@
 import uuid
+import json
+import base64
+import hashlib
 import logging
 import enum
+import re
 from datetime import datetime
 
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from pydantic import BaseModel, Field, ConfigDict
 
-from sqlalchemy import select
+from sqlalchemy import select, or_, and_
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 
@@ -60,10 +64,26 @@ class Chunk(BaseModel):
         ...,
         description="Timestamp when the chunk was last updated."
     )
+    distance: Optional[float] = Field(
+        default=None,
+        description="Cosine distance between the chunk and the query."
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class SearchPage(BaseModel):
+
+    chunks: List[Chunk] = Field(
+        default_factory=list,
+        description="The chunks of the current page, nearest first."
+    )
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Opaque cursor for the next page. None if there are no more results."
+    )
+
+
 class EmbeddingModel(enum.Enum):
     """Enum for embedding models."""
 
@@ -132,42 +152,106 @@ class Retrieve:
         query: str,
         k: int = 5,
         filter: Optional[dict] = None,
+        snippet_chars: Optional[int] = None,
         **kwargs,
-    ):
+    ) -> List[Chunk]:
         """Perform a similarity search for the given query.
 
         Args:
             query (str): The query string.
             k (int, optional): The number of similar documents to retrieve. Defaults to 5.
             filter (dict, optional): Additional filters for the search. Defaults to None.
+            snippet_chars (int, optional): Truncate each chunk to a snippet of at most this many characters,
+                "..." markers included, around the matching text. Defaults to None (full chunk).
 
         Returns:
             List[Chunk]: A list of similar chunks.
         """
+        return self.paginated_similarity_search(
+            query=query,
+            k=k,
+            filter=filter,
+            snippet_chars=snippet_chars,
+            **kwargs,
+        ).chunks
+
+    def paginated_similarity_search(
+        self,
+        *,
+        query: str,
+        k: int = 5,
+        cursor: Optional[str] = None,
+        filter: Optional[dict] = None,
+        snippet_chars: Optional[int] = None,
+        **kwargs,
+    ) -> SearchPage:
+        """Perform a similarity search for the given query, one page at a time.
+
+        Only the columns needed to build a `Chunk` are selected, so the `vector`
+        column is never fetched from the database.
+
+        Args:
+            query (str): The query string.
+            k (int, optional): The page size. Defaults to 5.
+            cursor (str, optional): The `next_cursor` of the previous page. Defaults to None (first page).
+            filter (dict, optional): Additional filters for the search. Defaults to None.
+            snippet_chars (int, optional): Truncate each chunk to a snippet of at most this many characters,
+                "..." markers included, around the matching text. Defaults to None (full chunk).
+
+        Returns:
+            SearchPage: The chunks of the page and the cursor for the next one.
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for a different query.
+        """
+        fingerprint = _query_fingerprint(query, filter, kwargs)
+        after = _decode_cursor(cursor, fingerprint) if cursor else None
         vector = self._embed(query)
 
         with self._session_maker() as session:
             try:
-                stmt = (
-                    select(VectorStore)
-                    # .where(VectorStore.vector.cosine_distance(vector) < 0.5)
-                    .order_by(VectorStore.vector.cosine_distance(vector))
-                    .limit(k)
+                distance = VectorStore.vector.cosine_distance(vector)
+                stmt = select(
+                    VectorStore.id,
+                    VectorStore.title,
+                    VectorStore.chunk,
+                    VectorStore.metafield,
+                    VectorStore.created_at,
+                    VectorStore.updated_at,
+                    distance.label("distance"),
                 )
-                resp = (
-                    session
-                    .execute(stmt)
-                    .scalars()
-                    .all()
+                if after is not None:
+                    after_distance, after_id = after
+                    stmt = stmt.where(or_(
+                        distance > after_distance,
+                        and_(distance == after_distance, VectorStore.id > after_id),
+                    ))
+                stmt = (
+                    stmt
+                    .order_by(distance, VectorStore.id)
+                    # Fetch one extra row to know whether another page exists.
+                    .limit(k + 1)
                 )
-                self.logger.info(f"Similarity search results: {len(resp)}")
-                result = [Chunk.model_validate(row) for row in resp]
-                return result
-        
+                rows = session.execute(stmt).all()
+
+                has_more = len(rows) > k
+                rows = rows[:k]
+                self.logger.info(f"Similarity search results: {len(rows)} (more: {has_more})")
+                # Rows come straight from the table, so skip pydantic validation.
+                chunks = [Chunk.model_construct(**row._asdict()) for row in rows]
+                if snippet_chars is not None:
+                    for chunk in chunks:
+                        chunk.chunk = _snippet(chunk.chunk, query, snippet_chars)
+
+                next_cursor = None
+                if has_more and chunks:
+                    next_cursor = _encode_cursor(chunks[-1].distance, chunks[-1].id, fingerprint)
+                return SearchPage(chunks=chunks, next_cursor=next_cursor)
+
             except Exception as e:
                 self.logger.error(f"Failed to perform similarity search: {e}")
                 session.rollback()
-                return []
+                return SearchPage()
 
     def _embed(self, text: str) -> List[float]:
         """Generate embeddings for the given text.
@@ -195,7 +279,80 @@ class Retrieve:
             cache.set_vector(vector=vector, text=text)
 
         return vector
-    
+
+
+def _query_fingerprint(query: str, filter: Optional[dict], metadata: dict) -> str:
+    """Hash the parameters that define a result set, so a cursor can't be reused across queries.
+
+    The page size `k` is left out on purpose: the keyset stays valid if it changes between pages.
+    """
+    payload = json.dumps(
+        {"query": query, "filter": filter, "metadata": metadata},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _encode_cursor(distance: float, id: str, fingerprint: str) -> str:
+    """Encode the position of the last returned row into an opaque cursor."""
+    payload = json.dumps({"d": distance, "id": id, "q": fingerprint}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def _decode_cursor(cursor: str, fingerprint: str) -> Tuple[float, str]:
+    """Decode a cursor made by `_encode_cursor` into (distance, id).
+
+    Raises:
+        ValueError: If the cursor is malformed or its fingerprint does not match.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        distance, id, cursor_fingerprint = float(payload["d"]), str(payload["id"]), payload["q"]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    if cursor_fingerprint != fingerprint:
+        raise ValueError(f"Cursor does not belong to this query: {cursor}")
+    return distance, id
+
+
+def _snippet(text: str, query: str, max_chars: int) -> str:
+    """Cut `text` down to `max_chars` characters centered on the first match of `query`.
+
+    The whole query is tried first, then its words from longest to shortest.
+    If nothing matches, the head of the text is returned. The "..." markers
+    count toward `max_chars`.
+    """
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+
+    terms = [query] + sorted(re.findall(r"\w{3,}", query), key=len, reverse=True)
+    position, length = 0, 0
+    for term in terms:
+        # Search the original text: lowercasing can change its length and shift positions.
+        found = re.search(re.escape(term), text, re.IGNORECASE)
+        if found is not None:
+            position, length = found.start(), len(found.group())
+            break
+
+    marker = "..."
+    budget = max_chars - 2 * len(marker)
+    if budget <= 0:
+        return text[:max_chars]
+
+    start = max(0, position + length // 2 - budget // 2)
+    start = min(start, len(text) - budget)
+    end = start + budget
+
+    # A window close to either edge needs only one marker; a marker never hides
+    # fewer characters than its own length.
+    if start < len(marker):
+        return f"{text[:max_chars - len(marker)]}{marker}"
+    if len(text) - end < len(marker):
+        return f"{marker}{text[len(text) - (max_chars - len(marker)):]}"
+    return f"{marker}{text[start:end]}{marker}"
+
 
 if __name__ == "__main__":
 
@@ -63,6 +63,10 @@ class CachedInMemoryVectorStore(CachedVectorStore):
         default="cached_vectorstore.json",
         description="Name of the JSON file."
     )
+    max_entries: Optional[int] = Field(
+        default=None,
+        description="Maximum number of vectors to keep. Least recently used ones are evicted first. None means unbounded."
+    )
 
     def __enter__(self) -> "CachedInMemoryVectorStore":
         """Load data from file when entering context manager."""
@@ -102,7 +106,11 @@ class CachedInMemoryVectorStore(CachedVectorStore):
         text: str, 
     ) -> List[float] | None:
         """Get the vector for a given text from in-memory store."""
-        return self.store_state.get(text, None)
+        vector = self.store_state.get(text, None)
+        if vector is not None and self.max_entries is not None:
+            # Move to the end so insertion order tracks recency.
+            self.store_state[text] = self.store_state.pop(text)
+        return vector
     
     def set_vector(
         self, 
@@ -111,7 +119,11 @@ class CachedInMemoryVectorStore(CachedVectorStore):
         text: str
     ) -> None:
         """Set the vector for a given text in in-memory store."""
+        self.store_state.pop(text, None)
         self.store_state[text] = vector
+        if self.max_entries is not None:
+            while len(self.store_state) > self.max_entries:
+                del self.store_state[next(iter(self.store_state))]
         return None
 
 
@@ -1,17 +1,119 @@
+import pytest
+
 from capabilities.tools import (
     retrieve_augmented_generation,
     add_information_to_vectorstore,
     search_web,
     crawl_url,
 )
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from modules import Retrieve, Document, SearchPage, CachedInMemoryVectorStore
+from modules.rag import VectorStore, vector_engine
+# Importing modules.rag sets up pgvector, so even the pure helper tests below
+# need a live Postgres: every test in this file is an integration test.
+from modules.rag.retrieve import _query_fingerprint, _encode_cursor, _decode_cursor, _snippet
+
+
+@pytest.fixture
+def seeded_ids():
+    """Collect ids of rows a test adds to the vectorstore and delete them afterwards."""
+    ids: list[str] = []
+    yield ids
+    with Session(vector_engine) as session:
+        session.execute(delete(VectorStore).where(VectorStore.id.in_(ids)))
+        session.commit()
+
 
-def test_retrieve_augmented_generation():
+def _seed(seeded_ids: list[str], title: str, chunk: str) -> None:
+    document = Document(title=title, chunk=chunk)
+    Retrieve(
+        user_name="test",
+        cache_manager=CachedInMemoryVectorStore(write_to_json=False),
+    ).add_document(document=document)
+    seeded_ids.append(document.id)
+
+
+def test_retrieve_augmented_generation(seeded_ids):
     query = "What is the capital of France?"
     k = 2
-    result = retrieve_augmented_generation(query, k)
-    assert isinstance(result, list)
-    assert len(result) == k
-    assert all(isinstance(doc, str) for doc in result)
+    for i in range(k + 1):
+        _seed(seeded_ids, f"France {i}", f"Paris is the capital of France. ({i})")
+
+    result = retrieve_augmented_generation(query=query, k=k)
+    assert isinstance(result, SearchPage)
+    assert len(result.chunks) == k
+    assert result.next_cursor is not None
+
+    next_page = retrieve_augmented_generation(query=query, k=k, cursor=result.next_cursor)
+    seen = {chunk.id for chunk in result.chunks}
+    assert len(next_page.chunks) > 0
+    assert all(chunk.id not in seen for chunk in next_page.chunks)
+
+
+def test_retrieve_augmented_generation_snippet(seeded_ids):
+    query = "What is the capital of France?"
+    snippet_chars = 20
+    _seed(seeded_ids, "France", "Long text about France. " * 10 + "Paris is the capital of France.")
+
+    result = retrieve_augmented_generation(query=query, k=5, snippet_chars=snippet_chars)
+    assert all(len(chunk.chunk) <= snippet_chars for chunk in result.chunks)
+
+    seeded = [chunk for chunk in result.chunks if chunk.id in seeded_ids]
+    assert len(seeded) > 0
+    assert all("capital" in chunk.chunk for chunk in seeded)
+
+
+def test_cursor_round_trip():
+    fingerprint = _query_fingerprint("query", None, {})
+    cursor = _encode_cursor(0.25, "chunk-id", fingerprint)
+    assert _decode_cursor(cursor, fingerprint) == (0.25, "chunk-id")
+
+
+def test_cursor_malformed():
+    with pytest.raises(ValueError):
+        _decode_cursor("not-a-cursor", _query_fingerprint("query", None, {}))
+
+
+def test_cursor_other_query():
+    cursor = _encode_cursor(0.25, "chunk-id", _query_fingerprint("query a", None, {}))
+    with pytest.raises(ValueError):
+        _decode_cursor(cursor, _query_fingerprint("query b", None, {}))
+
+
+def test_snippet_centered_on_match():
+    text = "a" * 100 + " Paris is the capital of France " + "b" * 100
+    result = _snippet(text, "capital", 30)
+    assert len(result) == 30
+    assert "capital" in result
+    assert result.startswith("...") and result.endswith("...")
+
+
+def test_snippet_no_match():
+    text = "a" * 100
+    assert _snippet(text, "zzz", 30) == "a" * 27 + "..."
+
+
+def test_snippet_match_after_case_changing_characters():
+    # "İ".lower() is two characters long.
+    result = _snippet("İ" * 10 + "capital" + "z" * 50, "capital", 20)
+    assert "capital" in result
+
+
+def test_snippet_near_edge():
+    text = "x" + "capital" + "y" * 40
+    assert _snippet(text, "capital", 14) == "xcapitalyyy..."
+
+
+def test_snippet_short_text():
+    assert _snippet("short text", "text", 30) == "short text"
+
+
+def test_snippet_non_positive():
+    text = "a" * 100
+    assert _snippet(text, "a", 0) == text
+    assert _snippet(text, "a", -1) == text
 
 
 def test_add_information_to_vectorstore():